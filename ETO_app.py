@@ -1,19 +1,184 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import datetime
+import os
+import uuid
+from filelock import FileLock
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 import plotly.express as px
-import seaborn as sns
-import matplotlib.pyplot as plt
-
-# Apply a modern theme from Seaborn to all Matplotlib/Seaborn plots
-sns.set_theme(style="whitegrid", palette="viridis")
+import plotly.graph_objects as go
+from plotly_resampler import FigureResampler
 
 st.set_page_config(page_title="SATAIR Operations Tracker", layout="wide")
 
+def _rows_to_df(rows_key, base, cols, dtypes, derive=None):
+    """Materialize the persisted base frame plus the session's new rows (st.session_state[rows_key]).
+
+    Every column type comes from dtypes in a single astype pass rather than being
+    inferred per row. Row lists are per-session and only grow, so the last frame is
+    kept in session state and rebuilt only when the row count changes.
+
+    derive, if given, adds computed columns to the combined frame on each rebuild.
+
+    Returns (df, key), where key is a token minted on each rebuild that identifies
+    this frame in the process-wide dashboard caches without hashing its contents.
+    """
+    rows = st.session_state[rows_key]
+    snapshot_key = f"{rows_key}_snapshot"
+    snapshot = st.session_state.get(snapshot_key)
+    if snapshot is None or snapshot[0] != len(rows):
+        if rows:
+            new_df = pd.DataFrame.from_records(rows, columns=list(cols))
+            # Re-apply dtypes after concat: categories that differ between the parts fall back to object
+            df = pd.concat([base, new_df], ignore_index=True).astype(dtypes)
+        else:
+            df = base
+        if derive is not None:
+            df = derive(df)
+        snapshot = (len(rows), df, uuid.uuid4().hex)
+        st.session_state[snapshot_key] = snapshot
+    return snapshot[1], snapshot[2]
+
+def _add_status_bits(df):
+    """Return df with the *_Status columns packed into a uint32 Status_Bits column (bit i = status_cols[i]).
+
+    Derived on load rather than stored, so reordering checklist_items can't misalign saved masks.
+    """
+    weights = np.left_shift(np.uint32(1), np.arange(len(status_cols), dtype=np.uint32))
+    return df.assign(Status_Bits=df[list(status_cols)].to_numpy(dtype=np.uint32) @ weights)
+
+def _load_frame(path, cols, dtypes):
+    """Read the submissions persisted under path into a typed DataFrame (empty if none yet)."""
+    if not os.path.isdir(path):
+        return pd.DataFrame(columns=list(cols)).astype(dtypes)
+    # Hold the dataset lock so a concurrent compaction can't expose both its merged file and the originals
+    with _dataset_lock(path):
+        df = pd.read_parquet(path, engine="pyarrow", columns=list(cols))
+    # Partition files come back in arbitrary order; restore chronological order
+    return df.sort_values("Date", kind="stable", ignore_index=True).astype(dtypes)
+
+def _persist_row(path, row, cols, dtypes):
+    """Append one submission to the parquet dataset at path, partitioned by month."""
+    df = pd.DataFrame.from_records([row], columns=list(cols)).astype(dtypes)
+    month = df["Date"].dt.strftime("%Y-%m").iloc[0]
+    df["Month"] = month
+    df.to_parquet(path, engine="pyarrow", partition_cols=["Month"], index=False)
+    month_dir = os.path.join(path, f"Month={month}")
+    if len(_parquet_files(month_dir)) > compact_threshold:
+        with _dataset_lock(path):
+            # Re-list under the lock: another session may have compacted this month already
+            files = _parquet_files(month_dir)
+            if len(files) > compact_threshold:
+                _compact_month(month_dir, files)
+
+def _dataset_lock(path):
+    """Exclusive lock serialising compaction and startup reads of the dataset at path."""
+    # Dot-prefixed, so parquet readers skip the lock file
+    return FileLock(os.path.join(path, ".lock"))
+
+def _parquet_files(month_dir):
+    return [os.path.join(month_dir, name) for name in os.listdir(month_dir) if name.endswith(".parquet")]
+
+def _compact_month(month_dir, files):
+    """Rewrite a month partition's per-submission files as a single parquet file.
+
+    Must be called with the dataset lock held.
+    """
+    table = ds.dataset(files, format="parquet").to_table()
+    name = uuid.uuid4().hex
+    # Write under a dot-prefixed name (skipped by parquet readers), then rename into place
+    tmp_path = os.path.join(month_dir, f".{name}.tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, os.path.join(month_dir, f"compacted-{name}.parquet"))
+    for file in files:
+        os.remove(file)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _csv_bytes(df, drop_cols=()):
+    """Encode a frame for st.download_button, which builds its payload on every rerun."""
+    return df.drop(columns=list(drop_cols)).to_csv(index=False).encode('utf-8')
+
+def _bar_figure(categories, values, horizontal=False):
+    """Build a single-trace go.Bar chart with one Viridis colour per category."""
+    categories = [str(c) for c in categories]
+    colors = dict(color=np.arange(len(categories)), colorscale="Viridis")
+    if horizontal:
+        fig = go.Figure(go.Bar(x=values, y=categories, orientation="h", marker=colors))
+        fig.update_yaxes(type="category")
+    else:
+        fig = go.Figure(go.Bar(x=categories, y=values, marker=colors))
+        fig.update_xaxes(type="category")
+    fig.update_layout(bargap=0.1)
+    return fig
+
+def _filter_by_date(df, start, end):
+    """Return the rows of df whose Date falls within [start, end]."""
+    dates = df['Date']
+    # Compare against Timestamp bounds to stay on the datetime64 path instead of .dt.date objects
+    lo = pd.Timestamp(start)
+    hi = pd.Timestamp(end) + pd.Timedelta(days=1)
+    mask = (dates >= lo) & (dates < hi)
+    return df[mask]
+
+# Dashboard aggregates are cached on (frame key, date range) so reruns triggered
+# by unrelated widgets are cache hits. The frames themselves are passed unhashed.
+# Row-level frames are not cached: unpickling a copy on each hit costs more than the mask.
+# The cache is process-wide, so each helper keeps only its most recent entries.
+@st.cache_data(show_spinner=False, max_entries=32)
+def _emt_crosstab(df_key, start, end, _filtered_df):
+    return _filtered_df.groupby(['Equipment', 'Activity'], sort=False, observed=True).size().unstack(fill_value=0)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _emt_equipment_counts(df_key, start, end, _filtered_df):
+    counts = _filtered_df['Equipment'].value_counts()
+    counts = counts[counts > 0].reset_index()
+    counts.columns = ['Equipment', 'Count']
+    return counts
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _6s_failure_counts(df_key, start, end, _filtered_df):
+    # Unpack the per-audit bitmasks (bit i = item i passed) and sum each bit position
+    bits = np.ascontiguousarray(_filtered_df['Status_Bits'].to_numpy(), dtype='<u4')
+    passed = np.unpackbits(bits.view(np.uint8), bitorder='little').reshape(-1, 32)[:, :len(status_cols)].sum(axis=0)
+    failures = pd.Series(len(_filtered_df) - passed, index=status_cols)
+    return failures.sort_values(ascending=False)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _6s_compliance_by_equip(df_key, start, end, _filtered_df):
+    return _filtered_df.groupby("Equipment", observed=True)['Compliance Score'].mean().reset_index()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _6s_heatmap_pivot(df_key, start, end, _filtered_df):
+    dates = _filtered_df['Date'].dt.normalize()
+    return _filtered_df.groupby(['Equipment', dates], observed=True)['Compliance Score'].mean().unstack()
+
 # --- 1. INITIALIZE SESSION STATE ---
+# Persisted history is loaded once per session as a typed base frame. New submissions
+# are kept as plain lists of dicts so each append is O(1), and are only combined with
+# the base frame when the Logs/Dashboard tabs render.
+# Each submission is also appended to a parquet dataset so history survives restarts.
+data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+activities_path = os.path.join(data_dir, "activities")
+audits_path = os.path.join(data_dir, "audits")
+# Each submission writes its own file; a month is merged into one file once it has more than this
+compact_threshold = 32
+# Dates are stored as datetime64; show them as plain dates in the Logs tables
+logs_column_config = {"Date": st.column_config.DateColumn("Date", format="YYYY-MM-DD")}
+
 # Initialize for Equipment Maintenance Tracker (EMT)
-if "activities" not in st.session_state:
-    st.session_state.activities = pd.DataFrame(columns=["Date", "Equipment", "Technician", "Activity", "Remarks"])
+activity_cols = ["Date", "Equipment", "Technician", "Activity", "Remarks"]
+activity_types = ["Inspection", "Repair", "Replacement", "Cleaning"]
+# Categorical columns let groupby work on integer codes instead of Python strings;
+# free-text columns are stored as Arrow-backed strings rather than Python objects
+activity_dtypes = {
+    "Date": "datetime64[ns]", "Equipment": "category", "Activity": pd.CategoricalDtype(activity_types),
+    "Technician": "string[pyarrow]", "Remarks": "string[pyarrow]",
+}
+if "_activities_rows" not in st.session_state:
+    st.session_state._activities_base = _load_frame(activities_path, activity_cols, activity_dtypes)
+    st.session_state._activities_rows = []
 
 # Initialize for 6S Audit Tracker
 checklist_items = {
@@ -24,13 +189,171 @@ checklist_items = {
     "Sustain": {"item_13": "Previous actions completed", "item_14": "Operators actively participate"},
     "Safety": {"item_15": "E-stops accessible", "item_16": "PPE used correctly", "item_17": "No safety hazards present"}
 }
-status_cols = [f"{key}_Status" for category in checklist_items.values() for key in category]
-remarks_cols = [f"{key}_Remarks" for category in checklist_items.values() for key in category]
+# Derived once at import; frozen as tuples since they never change at runtime
+status_cols = tuple(f"{key}_Status" for category in checklist_items.values() for key in category)
+remarks_cols = tuple(f"{key}_Remarks" for category in checklist_items.values() for key in category)
+item_map = {f"{k}_Status": v for cat in checklist_items.values() for k, v in cat.items()}
+# Per category: (description, widget keys, column names, bit position in status_cols) for each item, formatted once
+checklist_form = {
+    category: tuple(
+        (desc, f"{key}_status", f"{key}_remarks", f"{key}_Status", f"{key}_Remarks", status_cols.index(f"{key}_Status"))
+        for key, desc in items.items()
+    )
+    for category, items in checklist_items.items()
+}
 base_cols_6s = ["Date", "Equipment", "Auditor", "Compliance Score"]
-all_cols_6s = base_cols_6s + status_cols + remarks_cols
+all_cols_6s = base_cols_6s + list(status_cols) + list(remarks_cols)
+audit_dtypes = {
+    "Date": "datetime64[ns]", "Equipment": "category", "Auditor": "category", "Compliance Score": np.float32,
+    **{col: np.bool_ for col in status_cols}, **{col: "string[pyarrow]" for col in remarks_cols},
+}
+# Status_Bits (added by _add_status_bits) packs the pass/fail columns into one uint32
+assert len(status_cols) <= 32, "Status_Bits is a uint32; the checklist can't exceed 32 items"
+
+if "_audits_rows" not in st.session_state:
+    st.session_state._audits_base = _load_frame(audits_path, all_cols_6s, audit_dtypes)
+    st.session_state._audits_rows = []
+
+# Dashboards run as fragments so their widgets rerun only the dashboard, not the whole app
+@st.fragment
+def _render_emt_dashboard(activities, activities_key):
+    """Maintenance dashboard; date-range changes rerun only this fragment."""
+    st.markdown("#### Select Date Range")
+    col_date1, col_date2 = st.columns(2)
+    start_date = col_date1.date_input("Start date", activities['Date'].min().date())
+    end_date = col_date2.date_input("End date", activities['Date'].max().date())
+
+    if start_date > end_date:
+        st.error("Error: End date must be after start date.")
+    else:
+        filtered_df = _filter_by_date(activities, start_date, end_date)
+
+        if filtered_df.empty:
+            st.warning("No data in the selected date range.")
+        else:
+            st.divider()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Total Activities", len(filtered_df))
+            activity_counts = filtered_df["Activity"].value_counts()
+            col2.metric("Inspections", activity_counts.get("Inspection", 0))
+            col3.metric("Repairs", activity_counts.get("Repair", 0))
+            
+            st.divider()
+            st.markdown("#### Visualizations")
+            c1, c2 = st.columns(2)
+
+            with c1:
+                st.markdown("**Activities by Type (Plotly)**")
+                # Activity has fixed categories, so value_counts includes types with no rows; plot only observed ones
+                observed_counts = activity_counts[activity_counts > 0]
+                fig = _bar_figure(observed_counts.index, observed_counts.to_numpy(), horizontal=True)
+                fig.update_layout(xaxis_title="Count", yaxis_title="Activity Type")
+                st.plotly_chart(fig, use_container_width=True)
+            
+            with c2:
+                st.markdown("**Activities per Equipment (Plotly)**")
+                # Plot the per-equipment aggregate rather than shipping the filtered frame to the browser
+                equipment_counts = _emt_equipment_counts(activities_key, start_date, end_date, filtered_df)
+                fig2 = _bar_figure(equipment_counts["Equipment"], equipment_counts["Count"].to_numpy())
+                fig2.update_layout(xaxis_title="Equipment", yaxis_title="Count")
+                st.plotly_chart(fig2, use_container_width=True, config={"staticPlot": False, "displayModeBar": False})
+
+            # --- NEW: Correlation Matrix ---
+            st.divider()
+            st.markdown("#### Correlation Matrix")
+            st.markdown("This matrix shows the relationship between equipment and maintenance activities.")
+            
+            # Create a pivot table to count activities per equipment
+            pivot_df = _emt_crosstab(activities_key, start_date, end_date, filtered_df)
+            
+            if not pivot_df.empty:
+                fig_corr = px.imshow(
+                    pivot_df.values, x=pivot_df.columns.astype(str), y=pivot_df.index.astype(str),
+                    text_auto='d', color_continuous_scale="Viridis", aspect="auto",
+                    labels=dict(x="Activity", y="Equipment", color="Count"),
+                    title="Equipment vs. Activity Frequency",
+                )
+                st.plotly_chart(fig_corr, use_container_width=True)
+            else:
+                st.info("Not enough data to display a correlation matrix.")
+
+@st.fragment
+def _render_6s_dashboard(audits, audits_key):
+    """6S audit dashboard; date-range changes rerun only this fragment."""
+    st.markdown("#### Select Date Range")
+    col_date1, col_date2 = st.columns(2)
+    start_date_6s = col_date1.date_input("Start date", audits['Date'].min().date(), key="6s_start")
+    end_date_6s = col_date2.date_input("End date", audits['Date'].max().date(), key="6s_end")
+
+    if start_date_6s > end_date_6s:
+        st.error("Error: End date must be after start date.")
+    else:
+        filtered_df_6s = _filter_by_date(audits, start_date_6s, end_date_6s)
+        
+        if filtered_df_6s.empty:
+            st.warning("No data in the selected date range.")
+        else:
+            st.divider()
+            col1, col2 = st.columns([1, 2])
+            with col1:
+                st.metric("Total Audits", len(filtered_df_6s))
+                st.metric("Avg. Compliance Score", f"{filtered_df_6s['Compliance Score'].mean():.1f}%")
+            with col2:
+                with st.container(border=True):
+                    st.markdown("**Top 3 Failing Items**")
+                    failure_counts = _6s_failure_counts(audits_key, start_date_6s, end_date_6s, filtered_df_6s)
+                    for i, (item_key, count) in enumerate(failure_counts.head(3).items()):
+                        desc = item_map.get(item_key, "Unknown")
+                        st.markdown(f"**{i+1}. {desc}** (Failed {count} times)")
+            
+            st.divider()
+            st.markdown("#### Visualizations")
+            
+            st.markdown("**Average Compliance by Equipment (Plotly)**")
+            compliance_by_equip = _6s_compliance_by_equip(audits_key, start_date_6s, end_date_6s, filtered_df_6s)
+            fig = _bar_figure(compliance_by_equip["Equipment"], compliance_by_equip["Compliance Score"].to_numpy())
+            fig.update_layout(
+                title="Average Compliance by Equipment", xaxis_title="Equipment",
+                yaxis_title="Average Score (%)", yaxis_range=[0, 105],
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # --- Compliance Score Over Time ---
+            st.divider()
+            st.markdown("**Compliance Score Over Time**")
+            timeline_df = filtered_df_6s[['Date', 'Equipment', 'Compliance Score']].sort_values('Date')
+            # FigureResampler downsamples (LTTB) so the trace size stays bounded as audits accumulate
+            fig_trend = FigureResampler(go.Figure())
+            # One trace per equipment so lines only join audits of the same equipment
+            for equipment, equipment_df in timeline_df.groupby('Equipment', observed=True, sort=False):
+                fig_trend.add_trace(
+                    go.Scattergl(name=str(equipment), mode="lines+markers"),
+                    hf_x=equipment_df['Date'].to_numpy(), hf_y=equipment_df['Compliance Score'].to_numpy(),
+                )
+            fig_trend.update_layout(title="Compliance Score Over Time", yaxis_title="Score (%)", yaxis_range=[0, 105])
+            st.plotly_chart(fig_trend, use_container_width=True)
+            
+            # --- NEW: Compliance Score Heatmap ---
+            st.divider()
+            st.markdown("**Compliance Score Heatmap**")
+            st.markdown("This heatmap shows the compliance score of each piece of equipment over time.")
+            
+            # Create a pivot table for the heatmap
+            heatmap_df = _6s_heatmap_pivot(audits_key, start_date_6s, end_date_6s, filtered_df_6s)
+            
+            if not heatmap_df.empty:
+                # Format date columns to be more readable
+                heatmap_df.columns = heatmap_df.columns.strftime('%Y-%m-%d')
+                fig_heatmap = px.imshow(
+                    heatmap_df.values, x=heatmap_df.columns, y=heatmap_df.index.astype(str),
+                    text_auto='.1f', color_continuous_scale="Viridis", aspect="auto",
+                    labels=dict(x="Date", y="Equipment", color="Score (%)"),
+                    title="Compliance Score by Equipment Over Time",
+                )
+                st.plotly_chart(fig_heatmap, use_container_width=True)
+            else:
+                st.info("Not enough data to display a compliance heatmap.")
 
-if "audits" not in st.session_state:
-    st.session_state.audits = pd.DataFrame(columns=all_cols_6s)
 
 # --- 2. SIDEBAR NAVIGATION ---
 st.sidebar.header("SATAIR")
@@ -60,84 +383,31 @@ if app_mode == "🛠️ Equipment Maintenance":
                     equipment = st.text_input("Equipment ID/Name", placeholder="e.g., Port-01")
                 with col2:
                     technician = st.text_input("Technician", placeholder="e.g., Jane Doe")
-                    activity = st.selectbox("Activity Type", ["Inspection", "Repair", "Replacement", "Cleaning"])
+                    activity = st.selectbox("Activity Type", activity_types)
                 remarks = st.text_area("Remarks", placeholder="Add any relevant notes here...")
                 submitted = st.form_submit_button("✅ Add Activity", use_container_width=True)
                 if submitted:
-                    new_entry = {"Date": date, "Equipment": equipment, "Technician": technician, "Activity": activity, "Remarks": remarks}
-                    st.session_state.activities = pd.concat([st.session_state.activities, pd.DataFrame([new_entry])], ignore_index=True)
+                    new_entry = {"Date": np.datetime64(date, 'D'), "Equipment": equipment, "Technician": technician, "Activity": activity, "Remarks": remarks}
+                    st.session_state._activities_rows.append(new_entry)
+                    _persist_row(activities_path, new_entry, activity_cols, activity_dtypes)
                     st.success("Activity added successfully!")
 
+    activities, activities_key = _rows_to_df("_activities_rows", st.session_state._activities_base, activity_cols, activity_dtypes)
+
     with tab2:
         st.subheader("📜 Maintenance Logs")
-        if st.session_state.activities.empty:
+        if activities.empty:
             st.info("No maintenance records yet.")
         else:
-            df = st.session_state.activities.copy()
-            st.dataframe(df, use_container_width=True)
-            st.download_button("⬇️ Download Logs (CSV)", df.to_csv(index=False), "maintenance_logs.csv", "text/csv")
+            st.dataframe(activities, use_container_width=True, column_config=logs_column_config)
+            st.download_button("⬇️ Download Logs (CSV)", _csv_bytes(activities), "maintenance_logs.csv", "text/csv")
 
     with tab3:
         st.subheader("📈 Maintenance Dashboard")
-        if st.session_state.activities.empty:
+        if activities.empty:
             st.warning("No data available to generate dashboard.")
         else:
-            df_dash = st.session_state.activities.copy()
-            df_dash['Date'] = pd.to_datetime(df_dash['Date'])
-            
-            st.markdown("#### Select Date Range")
-            col_date1, col_date2 = st.columns(2)
-            start_date = col_date1.date_input("Start date", df_dash['Date'].min().date())
-            end_date = col_date2.date_input("End date", df_dash['Date'].max().date())
-
-            if start_date > end_date:
-                st.error("Error: End date must be after start date.")
-            else:
-                mask = (df_dash['Date'].dt.date >= start_date) & (df_dash['Date'].dt.date <= end_date)
-                filtered_df = df_dash[mask]
-
-                if filtered_df.empty:
-                    st.warning("No data in the selected date range.")
-                else:
-                    st.divider()
-                    col1, col2, col3 = st.columns(3)
-                    col1.metric("Total Activities", len(filtered_df))
-                    col2.metric("Inspections", (filtered_df["Activity"] == "Inspection").sum())
-                    col3.metric("Repairs", (filtered_df["Activity"] == "Repair").sum())
-                    
-                    st.divider()
-                    st.markdown("#### Visualizations")
-                    c1, c2 = st.columns(2)
-
-                    with c1:
-                        st.markdown("**Activities by Type (Seaborn)**")
-                        fig, ax = plt.subplots()
-                        sns.countplot(data=filtered_df, y="Activity", ax=ax, hue="Activity", legend=False)
-                        ax.set_ylabel("Activity Type")
-                        ax.set_xlabel("Count")
-                        st.pyplot(fig)
-                    
-                    with c2:
-                        st.markdown("**Activities per Equipment (Plotly)**")
-                        fig2 = px.histogram(filtered_df, x="Equipment", color="Equipment")
-                        st.plotly_chart(fig2, use_container_width=True)
-
-                    # --- NEW: Correlation Matrix ---
-                    st.divider()
-                    st.markdown("#### Correlation Matrix")
-                    st.markdown("This matrix shows the relationship between equipment and maintenance activities.")
-                    
-                    # Create a pivot table to count activities per equipment
-                    pivot_df = pd.crosstab(filtered_df['Equipment'], filtered_df['Activity'])
-                    
-                    if not pivot_df.empty:
-                        fig_corr, ax_corr = plt.subplots()
-                        sns.heatmap(pivot_df, annot=True, cmap="viridis", fmt='d', ax=ax_corr)
-                        ax_corr.set_title("Equipment vs. Activity Frequency")
-                        st.pyplot(fig_corr)
-                    else:
-                        st.info("Not enough data to display a correlation matrix.")
-
+            _render_emt_dashboard(activities, activities_key)
 
 elif app_mode == "🤖 6S Audits":
     st.title("🤖 Autostore 6S Audit Tracker")
@@ -157,94 +427,40 @@ elif app_mode == "🤖 6S Audits":
                     auditor = st.text_input("Auditor Name", placeholder="e.g., John Smith")
                 st.info("Check the box if the item passes inspection.", icon="💡")
                 results = {}
-                for category, items in checklist_items.items():
+                status_bits = 0
+                for category, items in checklist_form.items():
                     with st.expander(f"**{category}**"):
-                        for key, desc in items.items():
+                        for desc, status_key, remarks_key, status_col, remarks_col, bit in items:
                             c1, c2 = st.columns([3, 2])
-                            status = c1.checkbox(desc, key=f"{key}_status")
-                            remarks = c2.text_input("Remarks", key=f"{key}_remarks", placeholder="Optional comments")
-                            results[f"{key}_Status"] = status
-                            results[f"{key}_Remarks"] = remarks
+                            status = c1.checkbox(desc, key=status_key)
+                            remarks = c2.text_input("Remarks", key=remarks_key, placeholder="Optional comments")
+                            results[status_col] = status
+                            results[remarks_col] = remarks
+                            status_bits |= int(status) << bit
                 if st.form_submit_button("✅ Submit Audit", use_container_width=True):
                     total_items = len(status_cols)
-                    passed_items = sum(1 for col in status_cols if results[col])
+                    passed_items = status_bits.bit_count()
                     score = (passed_items / total_items) * 100 if total_items > 0 else 0
-                    new_entry = {"Date": date, "Equipment": equipment, "Auditor": auditor, "Compliance Score": score, **results}
-                    st.session_state.audits = pd.concat([st.session_state.audits, pd.DataFrame([new_entry])], ignore_index=True)
+                    new_entry = {"Date": np.datetime64(date, 'D'), "Equipment": equipment, "Auditor": auditor, "Compliance Score": score, **results}
+                    st.session_state._audits_rows.append(new_entry)
+                    _persist_row(audits_path, new_entry, all_cols_6s, audit_dtypes)
                     st.success(f"Audit submitted successfully! Compliance Score: {score:.1f}%")
+
+    audits, audits_key = _rows_to_df(
+        "_audits_rows", st.session_state._audits_base, all_cols_6s, audit_dtypes, derive=_add_status_bits,
+    )
     
     with tab2:
         st.subheader("📜 Historical Audit Logs")
-        if st.session_state.audits.empty:
+        if audits.empty:
             st.info("No audit records yet.")
         else:
-            df_filtered = st.session_state.audits.copy()
-            st.dataframe(df_filtered[base_cols_6s + [col for col in df_filtered.columns if '_Status' in col]], use_container_width=True)
-            st.download_button("⬇️ Download Full Logs (CSV)", df_filtered.to_csv(index=False), "6s_audit_logs.csv", "text/csv")
+            st.dataframe(audits[base_cols_6s + [col for col in audits.columns if '_Status' in col]], use_container_width=True, column_config=logs_column_config)
+            st.download_button("⬇️ Download Full Logs (CSV)", _csv_bytes(audits, ("Status_Bits",)), "6s_audit_logs.csv", "text/csv")
 
     with tab3:
         st.subheader("📈 6S Audit Dashboard")
-        if st.session_state.audits.empty:
+        if audits.empty:
             st.warning("No data available to generate dashboard.")
         else:
-            df_dash = st.session_state.audits.copy()
-            df_dash['Date'] = pd.to_datetime(df_dash['Date'])
-
-            st.markdown("#### Select Date Range")
-            col_date1, col_date2 = st.columns(2)
-            start_date_6s = col_date1.date_input("Start date", df_dash['Date'].min().date(), key="6s_start")
-            end_date_6s = col_date2.date_input("End date", df_dash['Date'].max().date(), key="6s_end")
-
-            if start_date_6s > end_date_6s:
-                st.error("Error: End date must be after start date.")
-            else:
-                mask_6s = (df_dash['Date'].dt.date >= start_date_6s) & (df_dash['Date'].dt.date <= end_date_6s)
-                filtered_df_6s = df_dash[mask_6s]
-                
-                if filtered_df_6s.empty:
-                    st.warning("No data in the selected date range.")
-                else:
-                    st.divider()
-                    col1, col2 = st.columns([1, 2])
-                    with col1:
-                        st.metric("Total Audits", len(filtered_df_6s))
-                        st.metric("Avg. Compliance Score", f"{filtered_df_6s['Compliance Score'].mean():.1f}%")
-                    with col2:
-                        with st.container(border=True):
-                            st.markdown("**Top 3 Failing Items**")
-                            status_df = filtered_df_6s[status_cols]
-                            failure_counts = (status_df == False).sum().sort_values(ascending=False)
-                            item_map = {f"{k}_Status": v for cat in checklist_items.values() for k, v in cat.items()}
-                            for i, (item_key, count) in enumerate(failure_counts.head(3).items()):
-                                desc = item_map.get(item_key, "Unknown")
-                                st.markdown(f"**{i+1}. {desc}** (Failed {count} times)")
-                    
-                    st.divider()
-                    st.markdown("#### Visualizations")
-                    
-                    st.markdown("**Average Compliance by Equipment (Seaborn)**")
-                    compliance_by_equip = filtered_df_6s.groupby("Equipment")['Compliance Score'].mean().reset_index()
-                    fig, ax = plt.subplots(figsize=(10, 4))
-                    sns.barplot(data=compliance_by_equip, x="Equipment", y="Compliance Score", ax=ax, palette="viridis", hue="Equipment")
-                    ax.set_title("Average Compliance by Equipment")
-                    ax.set_ylabel("Average Score (%)")
-                    ax.set_ylim(0, 105)
-                    st.pyplot(fig)
-                    
-                    # --- NEW: Compliance Score Heatmap ---
-                    st.divider()
-                    st.markdown("**Compliance Score Heatmap**")
-                    st.markdown("This heatmap shows the compliance score of each piece of equipment over time.")
-                    
-                    # Create a pivot table for the heatmap
-                    heatmap_df = filtered_df_6s.pivot_table(index='Equipment', columns='Date', values='Compliance Score', aggfunc='mean')
-                    
-                    if not heatmap_df.empty:
-                        # Format date columns to be more readable
-                        heatmap_df.columns = heatmap_df.columns.strftime('%Y-%m-%d')
-                        fig_heatmap, ax_heatmap = plt.subplots(figsize=(12, max(4, len(heatmap_df.index) * 0.5)))
-                        sns.heatmap(heatmap_df, annot=True, cmap="viridis", fmt='.1f', linewidths=.5, ax=ax_heatmap)
-                        ax_heatmap.set_title("Compliance Score by Equipment Over Time")
-                        st.pyplot(fig_heatmap)
-                    else:
-                        st.info("Not enough data to display a compliance heatmap.")
\ No newline at end of file
+            _render_6s_dashboard(audits, audits_key)
\ No newline at end of file